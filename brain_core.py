@@ -231,6 +231,14 @@ def main():
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
+    # 有uvloop时使用libuv事件循环（仅Linux/macOS），否则保持标准asyncio
+    try:
+        import uvloop
+        uvloop.install()
+        logger.info("✅ 已启用uvloop事件循环")
+    except ImportError:
+        pass
+    
     brain = BrainCore()
     
     try:
@@ -5,7 +5,7 @@
 
 import asyncio
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import logging
 
 # 导入管理员
@@ -68,31 +68,60 @@ class DataStore:
         更新市场数据 → 自动进入5步流水线
         """
         async with self.locks['market_data']:
-            # 初始化数据结构
-            if exchange not in self.market_data:
-                self.market_data[exchange] = {}
-            if symbol not in self.market_data[exchange]:
-                self.market_data[exchange][symbol] = {}
-            
-            # 获取数据类型
-            data_type = data.get("data_type", "unknown")
-            
-            # 存储数据
-            self.market_data[exchange][symbol][data_type] = {
-                **data,
-                'store_timestamp': datetime.now().isoformat(),
-                'source': 'websocket'
-            }
-            
-            # 存储最新引用
-            self.market_data[exchange][symbol]['latest'] = data_type
-            
-            # 调试日志
-            if data_type in ['funding_rate', 'mark_price']:
-                funding_rate = data.get('funding_rate', 0)
-                logger.debug(f"[DataStore] 存储 {exchange} {symbol} {data_type} = {funding_rate:.6f}")
+            data_type = self._store_market_data(exchange, symbol, data)
         
         # **核心：推送到流水线**
+        await self._ingest_market_data(exchange, symbol, data_type, data)
+    
+    async def update_market_data_batch(self, items: List[Tuple[str, str, Dict[str, Any]]]):
+        """
+        批量更新市场数据（items 为 (exchange, symbol, data)）→ 只加一次锁，再逐条进入流水线
+        单条数据存储失败只跳过该条，不影响同批其他数据
+        """
+        if not items:
+            return
+        
+        stored = []
+        async with self.locks['market_data']:
+            for exchange, symbol, data in items:
+                try:
+                    stored.append((exchange, symbol, self._store_market_data(exchange, symbol, data), data))
+                except Exception as e:
+                    logger.error(f"存储市场数据失败: {exchange} {symbol}: {e}，已跳过")
+        
+        for exchange, symbol, data_type, data in stored:
+            await self._ingest_market_data(exchange, symbol, data_type, data)
+    
+    def _store_market_data(self, exchange: str, symbol: str, data: Dict[str, Any]) -> str:
+        """存储单条市场数据（调用方需持有 market_data 锁），返回数据类型"""
+        # 初始化数据结构
+        if exchange not in self.market_data:
+            self.market_data[exchange] = {}
+        if symbol not in self.market_data[exchange]:
+            self.market_data[exchange][symbol] = {}
+        
+        # 获取数据类型
+        data_type = data.get("data_type", "unknown")
+        
+        # 存储数据
+        self.market_data[exchange][symbol][data_type] = {
+            **data,
+            'store_timestamp': datetime.now().isoformat(),
+            'source': 'websocket'
+        }
+        
+        # 存储最新引用
+        self.market_data[exchange][symbol]['latest'] = data_type
+        
+        # 调试日志
+        if data_type in ['funding_rate', 'mark_price']:
+            funding_rate = data.get('funding_rate', 0)
+            logger.debug(f"[DataStore] 存储 {exchange} {symbol} {data_type} = {funding_rate:.6f}")
+        
+        return data_type
+    
+    async def _ingest_market_data(self, exchange: str, symbol: str, data_type: str, data: Dict[str, Any]):
+        """推送单条市场数据到流水线"""
         try:
             pipeline_data = {
                 "exchange": exchange,
@@ -74,9 +74,7 @@ class WebSocketAdmin:
             
             if not pool.monitor_scheduler_task or pool.monitor_scheduler_task.done():
                 logger.warning(f"[管理员] ⚠️ [{exchange_name}] 调度循环未运行，强制执行")
-                pool.monitor_scheduler_task = asyncio.create_task(
-                    pool._monitor_scheduling_loop()
-                )
+                pool._start_monitor_scheduler()
                 logger.info(f"[管理员] ✅ [{exchange_name}] 调度循环已强制启动")
             else:
                 logger.info(f"[管理员] ✅ [{exchange_name}] 监控调度器状态正常")
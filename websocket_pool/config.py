@@ -25,6 +25,9 @@ EXCHANGE_CONFIGS = {
         "monitor_enabled": True,        # 启用监控
         "reconnect_interval": 3,        # 重连间隔(秒)
         "ping_interval": 30,            # 心跳间隔(秒)
+        "standby_reconnect_interval": 5,  # 温备断线重连检查间隔(秒)
+        "status_report_interval": 10,     # 状态上报间隔(秒)
+        "symbol_cache_ttl": 6 * 3600,     # API合约列表磁盘缓存有效期(秒)
     },
     "okx": {
         "ws_public_url": "wss://ws.okx.com:8443/ws/v5/public",
@@ -46,6 +49,9 @@ EXCHANGE_CONFIGS = {
         "monitor_enabled": True,
         "reconnect_interval": 3,
         "ping_interval": 30,
+        "standby_reconnect_interval": 5,
+        "status_report_interval": 10,
+        "symbol_cache_ttl": 6 * 3600,
     }
 }
 
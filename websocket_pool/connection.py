@@ -5,11 +5,17 @@
 import asyncio
 import json
 import logging
+import ssl
 from datetime import datetime
 from typing import Dict, Any, Optional, Callable
 import websockets
-import aiohttp
-import time
+
+# 可选：orjson 解析行情消息更快（解析错误同样是 json.JSONDecodeError 的子类）
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # 🚨 新增导入 - 合约收集器
 try:
@@ -37,7 +43,10 @@ class WebSocketConnection:
         connection_id: str,
         connection_type: str,
         data_callback: Callable,
-        symbols: list = None
+        symbols: list = None,
+        on_connected: Optional[Callable] = None,
+        on_disconnected: Optional[Callable] = None,
+        ssl_context: Optional[ssl.SSLContext] = None
     ):
         self.exchange = exchange
         self.ws_url = ws_url
@@ -46,6 +55,11 @@ class WebSocketConnection:
         self.original_type = connection_type
         self.data_callback = data_callback
         self.symbols = symbols or []
+        # 连接建立/意外断开时的通知回调（由连接池注册，参数为本连接）
+        self.on_connected = on_connected
+        self.on_disconnected = on_disconnected
+        # 连接池共享的TLS上下文（为None时由websockets按URL自行创建）
+        self.ssl_context = ssl_context
         
         # 连接状态
         self.ws = None
@@ -60,6 +74,9 @@ class WebSocketConnection:
         self.receive_task = None
         self.delayed_subscribe_task = None
         
+        # 每次连接成功时新建，连接断开时完成；连接池可直接 await 断开事件
+        self._disconnect_future: Optional[asyncio.Future] = None
+        
         # 🚨 【关键修复】每个连接独立的计数器
         self.ticker_count = 0          # 币安ticker计数
         self.okx_ticker_count = 0      # OKX ticker计数
@@ -77,18 +94,23 @@ class WebSocketConnection:
         try:
             logger.info(f"[{self.connection_id}] 正在连接 {self.ws_url}")
             
+            # 只在有共享TLS上下文时传入（ws:// 地址不能带ssl参数）
+            connect_kwargs = {"ssl": self.ssl_context} if self.ssl_context is not None else {}
+            
             # 🚨 增强：增加连接超时保护
             self.ws = await asyncio.wait_for(
                 websockets.connect(
                     self.ws_url,
                     ping_interval=self.ping_interval,
                     ping_timeout=self.ping_interval + 5,
-                    close_timeout=1
+                    close_timeout=1,
+                    **connect_kwargs
                 ),
                 timeout=30  # 30秒超时
             )
             
             self.connected = True
+            self._disconnect_future = asyncio.get_running_loop().create_future()
             self.last_message_time = datetime.now()
             self.reconnect_count = 0
             
@@ -114,6 +136,13 @@ class WebSocketConnection:
             elif self.connection_type == ConnectionType.MONITOR:
                 logger.info(f"[{self.connection_id}] 监控连接已就绪（不订阅）")
             
+            # 订阅成功后才通知连接池（订阅失败时连接池不会计入该连接）
+            if self.on_connected:
+                try:
+                    self.on_connected(self)
+                except Exception as e:
+                    logger.error(f"[{self.connection_id}] 连接通知回调失败: {e}")
+            
             # 启动接收任务
             self.receive_task = asyncio.create_task(self._receive_messages())
             
@@ -121,13 +150,25 @@ class WebSocketConnection:
             
         except asyncio.TimeoutError:
             logger.error(f"[{self.connection_id}] 连接超时30秒")
-            self.connected = False
+            await self._abort_connect()
             return False
         except Exception as e:
             logger.error(f"[{self.connection_id}] 连接失败: {e}")
-            self.connected = False
+            await self._abort_connect()
             return False
     
+    async def _abort_connect(self):
+        """连接过程中失败：重置状态、唤醒等待断开的调度方并关闭socket（未通知过连接池，不触发断开回调）"""
+        self.connected = False
+        self.subscribed = False
+        self.is_active = False
+        self._resolve_disconnect_future()
+        if self.ws is not None:
+            try:
+                await self.ws.close()
+            except Exception:
+                pass
+    
     def _get_delay_for_warm_standby(self):
         """根据连接ID获取延迟时间，错开订阅"""
         # 从连接ID中提取编号，如 "binance_warm_0" -> 0
@@ -381,22 +422,55 @@ class WebSocketConnection:
             async for message in self.ws:
                 self.last_message_time = datetime.now()
                 await self._process_message(message)
+            
+            # 对端正常关闭时 async for 直接结束，不会抛出异常（主动断开时 connected 已为 False）
+            if self.connected:
+                logger.warning(f"[{self.connection_id}] 连接已关闭")
+                self._mark_disconnected()
                 
         except websockets.exceptions.ConnectionClosed:
             logger.warning(f"[{self.connection_id}] 连接关闭")
-            self.connected = False
-            self.subscribed = False
-            self.is_active = False
+            self._mark_disconnected()
         except Exception as e:
             logger.error(f"[{self.connection_id}] 接收消息错误: {e}")
-            self.connected = False
-            self.subscribed = False
-            self.is_active = False
+            self._mark_disconnected()
+    
+    def _mark_disconnected(self):
+        """标记连接断开，并通知连接池"""
+        was_connected = self.connected
+        self.connected = False
+        self.subscribed = False
+        self.is_active = False
+        
+        self._resolve_disconnect_future()
+        
+        if was_connected and self.on_disconnected:
+            try:
+                self.on_disconnected(self)
+            except Exception as e:
+                logger.error(f"[{self.connection_id}] 断开通知回调失败: {e}")
+    
+    def _resolve_disconnect_future(self):
+        """完成断开future，唤醒等待该连接断开的调度方"""
+        if self._disconnect_future is not None and not self._disconnect_future.done():
+            self._disconnect_future.set_result(self)
+    
+    @property
+    def last_message_seconds_ago(self) -> Optional[float]:
+        """距最后一条消息的秒数（尚未收到消息时为None）"""
+        if self.last_message_time is None:
+            return None
+        return (datetime.now() - self.last_message_time).total_seconds()
+    
+    @property
+    def disconnect_future(self) -> Optional[asyncio.Future]:
+        """本次连接的断开future（连接断开时完成，结果为本连接）"""
+        return self._disconnect_future
     
     async def _process_message(self, message):
         """处理接收到的消息"""
         try:
-            data = json.loads(message)
+            data = _json_loads(message)
             
             if self.exchange == "binance" and "id" in data:
                 logger.info(f"[{self.connection_id}] 收到订阅响应 ID={data.get('id')}")
@@ -556,8 +630,8 @@ class WebSocketConnection:
             
             # 🚨 修复：关闭WebSocket连接
             if self.ws and self.connected:
-                await self.ws.close()
                 self.connected = False
+                await self.ws.close()
                 logger.info(f"[{self.connection_id}] WebSocket已关闭")
                 
             # 🚨 修复：取消接收任务
@@ -567,6 +641,7 @@ class WebSocketConnection:
                 
             self.subscribed = False
             self.is_active = False
+            self._resolve_disconnect_future()
             
             logger.info(f"[{self.connection_id}] 连接已完全断开")
             
@@ -4,40 +4,78 @@
 """
 import asyncio
 import logging
-import sys
-import os
+import ssl
+import time
+from itertools import chain
 from typing import Dict, Any, List, Optional
-from datetime import datetime
-
-# 设置导入路径
-current_dir = os.path.dirname(os.path.abspath(__file__))
-root_dir = os.path.dirname(os.path.dirname(current_dir))  # brain_core目录
-if root_dir not in sys.path:
-    sys.path.insert(0, root_dir)
 
+# shared_data 与 websocket_pool 同为项目根目录下的顶层包（由 brain_core.py 入口加入 sys.path）
 from shared_data.data_store import data_store
 from .connection import WebSocketConnection, ConnectionType
 from .config import EXCHANGE_CONFIGS
 
 logger = logging.getLogger(__name__)
 
+# 状态无变化时，至少每隔多少秒强制上报一次（保活）
+STATUS_FORCE_REPORT_INTERVAL = 30.0
+
+# 监控调度间隔(秒)：一切正常时按倍率退避到上限，发现异常时回到下限
+MONITOR_MIN_INTERVAL = 3.0
+MONITOR_MAX_INTERVAL = 30.0
+MONITOR_BACKOFF_FACTOR = 1.5
+
+# 温备连接的心跳合约
+_HEARTBEAT_SYMBOLS = {
+    "binance": ("BTCUSDT",),
+    "okx": ("BTC-USDT-SWAP",),
+}
+
+# get_status 缓存有效期(秒)，期内的并发查询共用同一份报告
+STATUS_CACHE_TTL = 1.0
+
 class ExchangeWebSocketPool:
     """单个交易所的WebSocket连接池 - 监控调度版"""
     
+    __slots__ = (
+        "exchange", "config", "data_callback",
+        "_ws_url", "_symbols_per_master", "_masters_count", "_warm_standbys_count", "_monitor_enabled",
+        "_hb_symbols_template", "_standby_reconnect_interval", "_status_report_interval",
+        "master_connections", "warm_standby_connections", "monitor_connection", "_master_order",
+        "symbols", "symbol_groups",
+        "health_check_task", "monitor_scheduler_task", "_background_tasks",
+        "_last_status_fingerprint", "_last_status_report", "_last_report_ts",
+        "_status_cache", "_status_cache_ts", "_status_inflight", "_status_inflight_fp", "_status_out_queue",
+        "_masters_connected", "_warms_connected", "_static_report_prefix",
+        "_ssl_context", "_prepared",
+    )
+    
     def __init__(self, exchange: str, data_callback=None):
         self.exchange = exchange
-        # 使用传入的回调，如果没有则创建默认回调
-        if data_callback:
-            self.data_callback = data_callback
-        else:
-            self.data_callback = self._create_default_callback()
+        # 使用传入的回调，如果没有则使用默认回调
+        self.data_callback = data_callback or self._default_callback
             
         self.config = EXCHANGE_CONFIGS.get(exchange, {})
         
-        # 连接池
-        self.master_connections = []
-        self.warm_standby_connections = []
+        # 配置项只读一次，避免在初始化/故障转移路径上反复查字典
+        self._ws_url = self.config.get("ws_public_url")
+        self._symbols_per_master = self.config.get("symbols_per_master", 300)
+        self._masters_count = self.config.get("masters_count", 3)
+        self._warm_standbys_count = self.config.get("warm_standbys_count", 3)
+        self._monitor_enabled = self.config.get("monitor_enabled", True)
+        self._hb_symbols_template = tuple(_HEARTBEAT_SYMBOLS.get(exchange, ()))
+        self._standby_reconnect_interval = self.config.get("standby_reconnect_interval", 5)
+        self._status_report_interval = self.config.get("status_report_interval", 10)
+        
+        # 连接共享的TLS上下文与准备状态（见 prepare）
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self._prepared = False
+        
+        # 连接池（connection_id -> WebSocketConnection）
+        self.master_connections: Dict[str, WebSocketConnection] = {}
+        self.warm_standby_connections: Dict[str, WebSocketConnection] = {}
         self.monitor_connection = None
+        # 合约分组索引 -> 当前负责该组的主连接ID
+        self._master_order: List[str] = []
         
         # 状态
         self.symbols = []
@@ -46,53 +84,109 @@ class ExchangeWebSocketPool:
         # 任务
         self.health_check_task = None
         self.monitor_scheduler_task = None
+        # 本连接池启动的所有后台任务，关闭时统一取消并等待结束
+        self._background_tasks = set()
+        
+        # 状态指纹：连接状态无变化时跳过状态上报（脏标记）
+        self._last_status_fingerprint: Optional[tuple] = None
+        self._last_status_report = None
+        self._last_report_ts = 0.0
+        
+        # 状态查询缓存 + 单飞（同一时刻只有一个报告在生成）
+        self._status_cache = None
+        self._status_cache_ts = 0.0
+        self._status_inflight: Optional[asyncio.Task] = None
+        self._status_inflight_fp: Optional[tuple] = None  # 生成中的报告开始时的状态指纹
+        
+        # 待写入共享存储的状态报告（只保留最新一份），由独立任务写入
+        self._status_out_queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        
+        # 状态报告中固定不变的字段，只构建一次
+        self._static_report_prefix = {"exchange": self.exchange, "pool_mode": "shared_pool"}
+        
+        # 已连接的主/温备连接数，由连接事件回调维护，健康检查直接读取
+        self._masters_connected = 0
+        self._warms_connected = 0
         
         logger.info(f"[{self.exchange}] ExchangeWebSocketPool 初始化完成")
 
-    def _create_default_callback(self):
-        """创建默认回调函数，直接对接共享数据模块"""
-        async def default_callback(data):
-            try:
-                if "exchange" not in data or "symbol" not in data:
-                    logger.warning(f"[{self.exchange}] 数据缺少必要字段: {data}")
-                    return
-                    
-                await data_store.update_market_data(
-                    data["exchange"],
-                    data["symbol"],
-                    data
-                )
-                    
-            except Exception as e:
-                logger.error(f"[{self.exchange}] 数据存储失败: {e}")
-        
-        return default_callback
+    async def _default_callback(self, data):
+        """默认回调函数，直接对接共享数据模块"""
+        try:
+            exchange = data.get("exchange")
+            symbol = data.get("symbol")
+            if exchange is None or symbol is None:
+                logger.warning(f"[{self.exchange}] 数据缺少必要字段: {data}")
+                return
+                
+            await data_store.update_market_data(exchange, symbol, data)
+                
+        except Exception as e:
+            logger.error(f"[{self.exchange}] 数据存储失败: {e}")
         
     async def initialize(self, symbols: List[str]):
-        """🚀 并发初始化 + 完整日志恢复"""
+        """🚀 一步完成初始化：准备（与合约无关的连接）+ 绑定合约"""
+        await self.prepare()
+        await self.bind_symbols(symbols)
+    
+    async def prepare(self):
+        """与合约无关的准备工作：TLS上下文 + 温备连接（可与获取合约列表并行执行）"""
+        # 加载CA证书是阻塞操作，放到线程里执行；所有连接共用同一个上下文
+        if self._ssl_context is None and self._ws_url and self._ws_url.startswith("wss://"):
+            self._ssl_context = await asyncio.to_thread(ssl.create_default_context)
+        
+        await self._run_init_steps([
+            ("温备连接", self._initialize_warm_standbys()),
+        ])
+        self._prepared = True
+    
+    async def bind_symbols(self, symbols: List[str]):
+        """绑定合约：分组后并发初始化主连接和监控调度器，并启动后台任务"""
+        if not self._prepared:
+            await self.prepare()
+        
         self.symbols = symbols
         
         # 🚨 恢复原始详细日志
-        symbols_per_master = self.config.get("symbols_per_master", 300)
+        symbols_per_master = self._symbols_per_master
         self.symbol_groups = [
             symbols[i:i + symbols_per_master]
             for i in range(0, len(symbols), symbols_per_master)
         ]
         
-        masters_count = self.config.get("masters_count", 3)
+        masters_count = self._masters_count
         if len(self.symbol_groups) > masters_count:
             self._balance_symbol_groups(masters_count)
         
         # 🚨 恢复原始关键日志（显示分组详情）
         logger.info(f"[{self.exchange}] 初始化连接池，共 {len(symbols)} 个合约，分为 {len(self.symbol_groups)} 组")
         
-        # 🚀 并发执行所有初始化任务
-        init_tasks = [
+        # 🚀 并发建立主连接与监控连接
+        await self._run_init_steps([
             ("主连接", self._initialize_masters()),
-            ("温备连接", self._initialize_warm_standbys()),
-            ("监控调度器", self._initialize_monitor_scheduler()),
-        ]
+            ("监控调度器", self._initialize_monitor_scheduler(start_loop=False)),
+        ])
+        
+        # 调度循环在新主连接登记之后才启动，否则会把尚未登记的分组或遗留连接当作故障处理
+        if (self.monitor_connection and self.monitor_connection.connected
+                and (not self.monitor_scheduler_task or self.monitor_scheduler_task.done())):
+            self._start_monitor_scheduler()
+            logger.info(f"[{self.exchange}_monitor] 监控调度循环已启动")
+        
+        # 🚨 强制后置检查：确保监控调度器必须运行
+        await self._enforce_monitor_scheduler()
+        
+        # 启动状态写入任务
+        self._spawn(self._status_writer_loop())
+        
+        # 启动健康检查
+        self.health_check_task = self._spawn(self._health_check_loop())
+        logger.info(f"[{self.exchange}] 健康检查已启动")
         
+        logger.info(f"[{self.exchange}] 连接池初始化全部完成！")
+    
+    async def _run_init_steps(self, init_tasks):
+        """并发执行一组初始化步骤，并记录每步的开始/完成日志"""
         # 🚨 为每个任务添加开始日志
         for name, _ in init_tasks:
             logger.info(f"[{self.exchange}] 开始初始化 {name}...")
@@ -108,15 +202,6 @@ class ExchangeWebSocketPool:
                 logger.error(f"[{self.exchange}] ❌ {name}初始化失败: {result}")
             else:
                 logger.info(f"[{self.exchange}] ✅ {name}初始化完成")
-        
-        # 🚨 强制后置检查：确保监控调度器必须运行
-        await self._enforce_monitor_scheduler()
-        
-        # 启动健康检查
-        self.health_check_task = asyncio.create_task(self._health_check_loop())
-        logger.info(f"[{self.exchange}] 健康检查已启动")
-        
-        logger.info(f"[{self.exchange}] 连接池初始化全部完成！")
     
     async def _enforce_monitor_scheduler(self):
         """强制确保监控调度器运行"""
@@ -128,11 +213,16 @@ class ExchangeWebSocketPool:
         # 检查调度循环是否运行
         if not self.monitor_scheduler_task or self.monitor_scheduler_task.done():
             logger.warning(f"[{self.exchange}] ⚠️ 调度循环未运行，强制启动...")
-            self.monitor_scheduler_task = asyncio.create_task(
-                self._monitor_scheduling_loop()
-            )
+            self._start_monitor_scheduler()
             logger.info(f"[{self.exchange}_monitor] 🚀 监控调度循环已强制启动")
 
+    def _spawn(self, coro) -> asyncio.Task:
+        """创建并登记后台任务，任务结束后自动移除登记"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+    
     def _balance_symbol_groups(self, target_groups: int):
         """平衡合约分组"""
         avg_size = len(self.symbols) // target_groups
@@ -150,83 +240,122 @@ class ExchangeWebSocketPool:
         logger.info(f"[{self.exchange}] 合约重新平衡为 {len(self.symbol_groups)} 组")
     
     async def _initialize_masters(self):
-        """初始化主连接 - 恢复详细日志"""
-        ws_url = self.config.get("ws_public_url")
+        """初始化主连接 - 所有握手并发进行"""
+        ws_url = self._ws_url
+        
+        conn_ids = [f"{self.exchange}_master_{i}" for i in range(len(self.symbol_groups))]
+        self._master_order = list(conn_ids)
+        pending = []
         
         # 🚨 恢复原始日志：显示分组详情
-        for i, symbol_group in enumerate(self.symbol_groups):
-            conn_id = f"{self.exchange}_master_{i}"
-            connection = WebSocketConnection(
+        for conn_id, symbol_group in zip(conn_ids, self.symbol_groups):
+            pending.append(WebSocketConnection(
                 exchange=self.exchange,
                 ws_url=ws_url,
                 connection_id=conn_id,
                 connection_type=ConnectionType.MASTER,
                 data_callback=self.data_callback,
-                symbols=symbol_group
-            )
+                symbols=symbol_group,
+                on_connected=self._on_connection_up,
+                on_disconnected=self._on_connection_down,
+                ssl_context=self._ssl_context
+            ))
             
             # 🚨 恢复原始日志：显示每个主连接的合约数
             logger.info(f"[{conn_id}] 主连接启动，订阅 {len(symbol_group)} 个合约")
-            
-            try:
-                success = await asyncio.wait_for(connection.connect(), timeout=30)
-                if success:
-                    self.master_connections.append(connection)
-                    logger.info(f"[{conn_id}] 主连接启动成功")
-                else:
-                    logger.error(f"[{conn_id}] 主连接启动失败")
-            except Exception as e:
-                logger.error(f"[{conn_id}] 主连接异常: {e}")
         
+        # 🚀 并发握手：总耗时约等于最慢的一个连接，而不是所有连接之和
+        results = await asyncio.gather(
+            *(asyncio.wait_for(conn.connect(), timeout=30) for conn in pending),
+            return_exceptions=True
+        )
+        
+        for connection, result in zip(pending, results):
+            conn_id = connection.connection_id
+            if result is True:
+                self.master_connections[conn_id] = connection
+                logger.info(f"[{conn_id}] 主连接启动成功")
+            elif isinstance(result, BaseException):
+                logger.error(f"[{conn_id}] 主连接异常: {result}")
+            else:
+                logger.error(f"[{conn_id}] 主连接启动失败")
+        
+        self._recount_connected()
         logger.info(f"[{self.exchange}] 主连接初始化完成: {len(self.master_connections)} 个")
     
     async def _initialize_warm_standbys(self):
-        """初始化温备连接 - 恢复详细日志"""
-        ws_url = self.config.get("ws_public_url")
-        warm_standbys_count = self.config.get("warm_standbys_count", 3)
+        """初始化温备连接 - 所有握手并发进行"""
+        ws_url = self._ws_url
+        warm_standbys_count = self._warm_standbys_count
         
-        for i in range(warm_standbys_count):
-            heartbeat_symbols = self._get_heartbeat_symbols()
-            
-            conn_id = f"{self.exchange}_warm_{i}"
-            connection = WebSocketConnection(
+        conn_ids = [f"{self.exchange}_warm_{i}" for i in range(warm_standbys_count)]
+        pending = []
+        
+        for conn_id in conn_ids:
+            pending.append(WebSocketConnection(
                 exchange=self.exchange,
                 ws_url=ws_url,
                 connection_id=conn_id,
                 connection_type=ConnectionType.WARM_STANDBY,
                 data_callback=self.data_callback,
-                symbols=heartbeat_symbols
-            )
+                symbols=self._get_heartbeat_symbols(),
+                on_connected=self._on_connection_up,
+                on_disconnected=self._on_connection_down,
+                ssl_context=self._ssl_context
+            ))
             
             logger.info(f"[{conn_id}] 温备连接启动（将延迟订阅心跳）")
-            
-            try:
-                success = await asyncio.wait_for(connection.connect(), timeout=30)
-                if success:
-                    self.warm_standby_connections.append(connection)
-                    logger.info(f"[{conn_id}] 温备连接启动成功")
-                else:
-                    logger.error(f"[{conn_id}] 温备连接启动失败")
-            except asyncio.TimeoutError:
+        
+        results = await asyncio.gather(
+            *(asyncio.wait_for(conn.connect(), timeout=30) for conn in pending),
+            return_exceptions=True
+        )
+        
+        for connection, result in zip(pending, results):
+            conn_id = connection.connection_id
+            if result is True:
+                self.warm_standby_connections[conn_id] = connection
+                logger.info(f"[{conn_id}] 温备连接启动成功")
+            elif isinstance(result, asyncio.TimeoutError):
                 logger.error(f"[{conn_id}] 温备连接超时30秒，强制跳过")
-            except Exception as e:
-                logger.error(f"[{conn_id}] 温备连接异常: {e}")
+            elif isinstance(result, BaseException):
+                logger.error(f"[{conn_id}] 温备连接异常: {result}")
+            else:
+                logger.error(f"[{conn_id}] 温备连接启动失败")
         
+        self._recount_connected()
         logger.info(f"[{self.exchange}] 温备连接初始化完成: {len(self.warm_standby_connections)} 个")
     
+    def _on_connection_up(self, conn: WebSocketConnection):
+        """连接建立回调：更新已连接计数"""
+        self._adjust_connected(conn, 1)
+    
+    def _on_connection_down(self, conn: WebSocketConnection):
+        """连接断开回调：更新已连接计数"""
+        self._adjust_connected(conn, -1)
+    
+    def _adjust_connected(self, conn: WebSocketConnection, delta: int):
+        """按连接当前所在的池调整计数（不在池中的连接忽略，由结构变化后的重新计数覆盖）"""
+        conn_id = conn.connection_id
+        if self.master_connections.get(conn_id) is conn:
+            self._masters_connected = max(0, self._masters_connected + delta)
+        elif self.warm_standby_connections.get(conn_id) is conn:
+            self._warms_connected = max(0, self._warms_connected + delta)
+    
+    def _recount_connected(self):
+        """连接池结构变化（初始化、故障转移）后重新计数"""
+        self._masters_connected = sum(1 for c in self.master_connections.values() if c.connected)
+        self._warms_connected = sum(1 for c in self.warm_standby_connections.values() if c.connected)
+    
     def _get_heartbeat_symbols(self):
-        """获取温备心跳合约列表"""
-        if self.exchange == "binance":
-            return ["BTCUSDT"]
-        elif self.exchange == "okx":
-            return ["BTC-USDT-SWAP"]
-        return []
-    
-    async def _initialize_monitor_scheduler(self):
-        """初始化监控调度器 - 恢复详细日志"""
-        ws_url = self.config.get("ws_public_url")
-        
-        if not self.config.get("monitor_enabled", True):
+        """获取温备心跳合约列表（返回副本，调用方可随意修改）"""
+        return list(self._hb_symbols_template)
+    
+    async def _initialize_monitor_scheduler(self, start_loop: bool = True):
+        """初始化监控调度器 - 恢复详细日志（start_loop=False 时只建立监控连接，由调用方启动调度循环）"""
+        ws_url = self._ws_url
+        
+        if not self._monitor_enabled:
             logger.warning(f"[{self.exchange}] 监控调度器被配置禁用")
             return
         
@@ -247,7 +376,8 @@ class ExchangeWebSocketPool:
                     connection_id=conn_id,
                     connection_type=ConnectionType.MONITOR,
                     data_callback=self.data_callback,
-                    symbols=[]
+                    symbols=[],
+                    ssl_context=self._ssl_context
                 )
                 
                 success = await asyncio.wait_for(self.monitor_connection.connect(), timeout=30)
@@ -255,10 +385,9 @@ class ExchangeWebSocketPool:
                 if success:
                     logger.info(f"[{conn_id}] 监控连接建立成功")
                     
-                    self.monitor_scheduler_task = asyncio.create_task(
-                        self._monitor_scheduling_loop()
-                    )
-                    logger.info(f"[{conn_id}] 监控调度循环已启动")
+                    if start_loop:
+                        self._start_monitor_scheduler()
+                        logger.info(f"[{conn_id}] 监控调度循环已启动")
                     return True
                     
             except asyncio.TimeoutError:
@@ -272,34 +401,128 @@ class ExchangeWebSocketPool:
         logger.error(f"[{conn_id}] 监控调度器在{max_retries}次尝试后仍失败")
         return False
     
+    def _start_monitor_scheduler(self) -> asyncio.Task:
+        """启动监控调度循环并登记退出回调（所有启动调度循环的地方都应调用此方法）"""
+        self.monitor_scheduler_task = self._spawn(self._monitor_scheduling_loop())
+        self.monitor_scheduler_task.add_done_callback(self._on_scheduler_exit)
+        return self.monitor_scheduler_task
+    
+    def _on_scheduler_exit(self, task: asyncio.Task):
+        """调度循环退出回调：异常退出时立即记录，无需等待轮询发现"""
+        if task.cancelled():
+            logger.info(f"[{self.exchange}_monitor] 监控调度循环已取消")
+            return
+        
+        error = task.exception()
+        if error:
+            logger.error(f"[{self.exchange}_monitor] ❌ 监控调度循环异常退出: {error}")
+        else:
+            logger.warning(f"[{self.exchange}_monitor] ⚠️ 监控调度循环已退出")
+    
     async def _monitor_scheduling_loop(self):
-        """监控调度循环 - 真正的权力中心"""
-        logger.info(f"[{self.exchange}_monitor] 开始监控调度循环，每3秒检查一次")
+        """监控调度循环 - 真正的权力中心：主连接故障转移、温备重连、状态上报三个循环各自独立运行"""
+        logger.info(f"[{self.exchange}_monitor] 开始监控调度循环，"
+                    f"主连接断开时立即故障转移，温备每 {self._standby_reconnect_interval} 秒检查，"
+                    f"状态每 {self._status_report_interval} 秒上报")
+        
+        await asyncio.gather(
+            self._failover_watcher(),
+            self._standby_rehydrator(),
+            self._status_reporter()
+        )
+    
+    async def _failover_watcher(self):
+        """主连接故障监视：主连接断开时立即唤醒并执行故障转移"""
+        interval = MONITOR_MIN_INTERVAL
+        lost = ()
         
         while True:
             try:
-                # 1. 监控所有主连接状态
-                for i, master_conn in enumerate(self.master_connections):
-                    if not master_conn.connected:
-                        logger.warning(f"[监控调度] [{self.exchange}] 主连接{i} ({master_conn.connection_id}) 断开")
-                        await self._monitor_handle_master_failure(i, master_conn)
+                # 被断开事件唤醒时只处理断开的主连接；超时醒来时全量扫描（兜底重试）
+                if not lost:
+                    lost = [conn for conn in self.master_connections.values() if not conn.connected]
                 
-                # 2. 监控所有温备连接状态
-                for i, warm_conn in enumerate(self.warm_standby_connections):
-                    if not warm_conn.connected:
-                        logger.warning(f"[监控调度] [{self.exchange}] 温备连接{i} ({warm_conn.connection_id}) 断开")
-                        await warm_conn.connect()
-                        if warm_conn.connected:
-                            logger.info(f"[监控调度] [{self.exchange}] 温备连接{i} 重连成功")
+                for conn in lost:
+                    await self._monitor_handle_lost_connection(conn)
                 
-                # 3. 定期报告状态
-                await self._report_status_to_data_store()
+                # 稳定时逐步放慢兜底扫描；任一主连接断开时立即唤醒（主连接尚未就绪时保持最短间隔）
+                if lost or not self.master_connections:
+                    interval = MONITOR_MIN_INTERVAL
+                else:
+                    interval = min(interval * MONITOR_BACKOFF_FACTOR, MONITOR_MAX_INTERVAL)
                 
-                await asyncio.sleep(3)
+                lost = await self._wait_for_disconnect(self.master_connections.values(), interval)
                 
             except Exception as e:
-                logger.error(f"[监控调度] [{self.exchange}] 调度循环错误: {e}")
-                await asyncio.sleep(3)
+                logger.error(f"[监控调度] [{self.exchange}] 故障转移循环错误: {e}")
+                interval = MONITOR_MIN_INTERVAL
+                lost = ()
+                await asyncio.sleep(MONITOR_MIN_INTERVAL)
+    
+    async def _standby_rehydrator(self):
+        """温备重连循环：定期重连断开的温备连接"""
+        while True:
+            try:
+                for conn in [c for c in self.warm_standby_connections.values() if not c.connected]:
+                    await self._monitor_handle_lost_connection(conn)
+                
+            except Exception as e:
+                logger.error(f"[监控调度] [{self.exchange}] 温备重连循环错误: {e}")
+            
+            await asyncio.sleep(self._standby_reconnect_interval)
+    
+    async def _status_reporter(self):
+        """状态上报循环：无变化时跳过，超过保活间隔时强制上报"""
+        while True:
+            try:
+                force = time.monotonic() - self._last_report_ts >= STATUS_FORCE_REPORT_INTERVAL
+                await self._refresh_status(force=force)
+                
+            except Exception as e:
+                logger.error(f"[监控调度] [{self.exchange}] 状态上报循环错误: {e}")
+            
+            await asyncio.sleep(self._status_report_interval)
+    
+    @staticmethod
+    async def _wait_for_disconnect(connections, timeout: float):
+        """等待给定连接中任一在线连接断开，返回已断开的连接（超时返回空）"""
+        fut_to_conn = {
+            conn.disconnect_future: conn
+            for conn in connections
+            if conn.connected and conn.disconnect_future is not None
+        }
+        
+        if not fut_to_conn:
+            await asyncio.sleep(timeout)
+            return ()
+        
+        done, _ = await asyncio.wait(fut_to_conn, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        return tuple(fut_to_conn[fut] for fut in done)
+    
+    async def _monitor_handle_lost_connection(self, conn: WebSocketConnection):
+        """处理单个断开的连接：主连接故障转移，温备连接直接重连"""
+        if conn.connected:
+            return
+        
+        conn_id = conn.connection_id
+        
+        if conn_id in self.master_connections:
+            try:
+                master_index = self._master_order.index(conn_id)
+            except ValueError:
+                # 不属于任何合约分组的主连接（不应出现）：移出主连接池并重新计数，不能让它卡住整个监视循环
+                logger.error(f"[监控调度] [{self.exchange}] 主连接 ({conn_id}) 不在分组索引中，已移出主连接池")
+                self.master_connections.pop(conn_id, None)
+                self._recount_connected()
+                return
+            logger.warning(f"[监控调度] [{self.exchange}] 主连接{master_index} ({conn_id}) 断开")
+            await self._monitor_handle_master_failure(master_index, conn)
+        
+        elif conn_id in self.warm_standby_connections:
+            logger.warning(f"[监控调度] [{self.exchange}] 温备连接 ({conn_id}) 断开")
+            await conn.connect()
+            if conn.connected:
+                logger.info(f"[监控调度] [{self.exchange}] 温备连接 ({conn_id}) 重连成功")
     
     async def _monitor_handle_master_failure(self, master_index: int, failed_master):
         """监控处理主连接故障"""
@@ -322,7 +545,7 @@ class ExchangeWebSocketPool:
     async def _select_best_standby_from_pool(self):
         """从共享池选择最佳温备"""
         available_standbys = [
-            conn for conn in self.warm_standby_connections 
+            conn for conn in self.warm_standby_connections.values()
             if conn.connected and not conn.is_active
         ]
         
@@ -333,7 +556,9 @@ class ExchangeWebSocketPool:
         selected_standby = min(
             available_standbys,
             key=lambda conn: (
-                conn.last_message_seconds_ago or 999,
+                # last_message_seconds_ago 为 None（尚未收到消息）时排在最后；0.0 不能被当成无数据
+                conn.last_message_seconds_ago is None,
+                conn.last_message_seconds_ago or 0.0,
                 conn.reconnect_count,
                 len(conn.symbols)
             )
@@ -364,10 +589,10 @@ class ExchangeWebSocketPool:
                 return False
             
             # 3. 更新连接池结构
-            if new_master in self.warm_standby_connections:
-                self.warm_standby_connections.remove(new_master)
-            
-            self.master_connections[master_index] = new_master
+            self.warm_standby_connections.pop(new_master.connection_id, None)
+            self.master_connections.pop(old_master.connection_id, None)
+            self.master_connections[new_master.connection_id] = new_master
+            self._master_order[master_index] = new_master.connection_id
             
             # 4. 原主连接重连为温备
             logger.info(f"[监控调度] [{self.exchange}] 步骤3: 原主连接重连为温备")
@@ -375,14 +600,13 @@ class ExchangeWebSocketPool:
             await asyncio.sleep(1)
             
             if await old_master.connect():
-                heartbeat_symbols = self._get_heartbeat_symbols()
-                await old_master.switch_role(ConnectionType.WARM_STANDBY, heartbeat_symbols)
+                await old_master.switch_role(ConnectionType.WARM_STANDBY, list(self._hb_symbols_template))
                 
-                if old_master not in self.warm_standby_connections:
-                    self.warm_standby_connections.append(old_master)
+                self.warm_standby_connections[old_master.connection_id] = old_master
                 
                 logger.info(f"[监控调度] [{self.exchange}] 原主连接已降级为温备")
             
+            self._recount_connected()
             logger.info(f"[监控调度] [{self.exchange}] 故障转移完成")
             await self._report_failover_to_data_store(master_index, old_master.connection_id, new_master.connection_id)
             
@@ -392,35 +616,70 @@ class ExchangeWebSocketPool:
             logger.error(f"[监控调度] [{self.exchange}] 故障转移执行失败: {e}")
             return False
     
-    async def _report_status_to_data_store(self):
-        """报告状态到共享存储"""
+    def _status_fingerprint(self) -> tuple:
+        """连接状态指纹：任一连接的连通/订阅/角色/重连次数变化都会改变指纹"""
+        monitor = (self.monitor_connection,) if self.monitor_connection else ()
+        return tuple(
+            (c.connection_id, c.connected, c.subscribed, c.is_active, c.reconnect_count)
+            for c in chain(self.master_connections.values(), self.warm_standby_connections.values(), monitor)
+        )
+    
+    async def _report_status_to_data_store(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """生成最新的状态报告并返回；状态指纹未变化且非强制时只跳过写入共享存储"""
+        fingerprint = self._status_fingerprint()
+        
         try:
-            status_report = {
-                "exchange": self.exchange,
-                "timestamp": datetime.now().isoformat(),
-                "masters": [],
-                "warm_standbys": [],
-                "monitor": None,
-                "pool_mode": "shared_pool"
-            }
+            status_report = dict(self._static_report_prefix)
+            status_report["timestamp"] = time.time()
+            status_report["monitor"] = None
             
-            for conn in self.master_connections:
-                status_report["masters"].append(await conn.check_health())
+            # 所有连接的健康检查并发执行（先取快照，等待期间连接池可能变化）
+            masters = tuple(self.master_connections.values())
+            warm_standbys = tuple(self.warm_standby_connections.values())
+            monitor = (self.monitor_connection,) if self.monitor_connection else ()
+            masters_count = len(masters)
+            warm_end = masters_count + len(warm_standbys)
             
-            for conn in self.warm_standby_connections:
-                status_report["warm_standbys"].append(await conn.check_health())
+            health = await asyncio.gather(
+                *(conn.check_health() for conn in masters + warm_standbys + monitor)
+            )
             
-            if self.monitor_connection:
-                status_report["monitor"] = await self.monitor_connection.check_health()
+            status_report["masters"] = health[:masters_count]
+            status_report["warm_standbys"] = health[masters_count:warm_end]
+            if monitor:
+                status_report["monitor"] = health[warm_end]
             
-            await data_store.update_connection_status(
-                self.exchange, 
-                "websocket_pool", 
-                status_report
-            )
+            self._last_status_report = status_report
+            
+            # 指纹只决定是否写入共享存储，返回给调用方的始终是刚生成的报告
+            if force or fingerprint != self._last_status_fingerprint:
+                # 交给写入任务异步落库，不阻塞调度循环；队列满时丢弃旧报告
+                try:
+                    self._status_out_queue.put_nowait(status_report)
+                except asyncio.QueueFull:
+                    self._status_out_queue.get_nowait()
+                    self._status_out_queue.put_nowait(status_report)
+                
+                self._last_status_fingerprint = fingerprint
+                self._last_report_ts = time.monotonic()
             
         except Exception as e:
             logger.error(f"[{self.exchange}] 报告状态失败: {e}")
+        
+        return self._last_status_report
+    
+    async def _status_writer_loop(self):
+        """状态写入循环：把最新的状态报告写入共享存储"""
+        while True:
+            status_report = await self._status_out_queue.get()
+            try:
+                await data_store.update_connection_status(
+                    self.exchange,
+                    "websocket_pool",
+                    status_report
+                )
+            except Exception as e:
+                logger.error(f"[{self.exchange}] 报告状态失败: {e}")
     
     async def _report_failover_to_data_store(self, master_index: int, old_master_id: str, new_master_id: str):
         """报告故障转移到共享存储"""
@@ -430,7 +689,7 @@ class ExchangeWebSocketPool:
                 "master_index": master_index,
                 "old_master": old_master_id,
                 "new_master": new_master_id,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": time.time(),
                 "type": "failover",
                 "pool_mode": "shared_pool"
             }
@@ -450,8 +709,8 @@ class ExchangeWebSocketPool:
         """健康检查循环"""
         while True:
             try:
-                masters_connected = sum(1 for c in self.master_connections if c.connected)
-                warm_connected = sum(1 for c in self.warm_standby_connections if c.connected)
+                masters_connected = self._masters_connected
+                warm_connected = self._warms_connected
                 
                 if masters_connected < len(self.master_connections):
                     logger.info(f"[健康检查] [{self.exchange}] {masters_connected}/{len(self.master_connections)} 个主连接活跃")
@@ -466,22 +725,71 @@ class ExchangeWebSocketPool:
                 await asyncio.sleep(30)
     
     async def get_status(self) -> Dict[str, Any]:
-        """获取连接池状态"""
-        return await self._report_status_to_data_store()
+        """获取连接池状态（状态未变化时1秒内复用缓存，并发请求合并为一次健康检查）"""
+        if (self._status_cache is not None
+                and self._status_fingerprint() == self._last_status_fingerprint
+                and time.monotonic() - self._status_cache_ts < STATUS_CACHE_TTL):
+            return self._status_cache
+        return await self._refresh_status()
+    
+    async def _refresh_status(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        生成状态报告并更新缓存。
+        正在生成的报告只在连接状态未变化时共用（强制上报不共用），否则另起一份新报告；
+        报告在独立任务中生成，某个等待方被取消不会影响其他等待方。
+        """
+        fingerprint = self._status_fingerprint()
+        inflight = self._status_inflight
+        if (not force and inflight is not None and not inflight.done()
+                and self._status_inflight_fp == fingerprint):
+            return await self._await_status_task(inflight)
+        
+        # 登记为后台任务，关闭连接池时一并取消，不会在连接拆除后继续生成报告
+        task = self._spawn(self._build_status_report(force))
+        self._status_inflight = task
+        self._status_inflight_fp = fingerprint
+        task.add_done_callback(self._clear_status_inflight)
+        return await self._await_status_task(task)
+    
+    async def _await_status_task(self, task: asyncio.Task) -> Optional[Dict[str, Any]]:
+        """等待报告任务；报告任务被取消（如连接池关闭）而调用方自身未被取消时，返回最近一份报告"""
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise
+            return self._status_cache or self._last_status_report
+    
+    async def _build_status_report(self, force: bool) -> Optional[Dict[str, Any]]:
+        """生成一份状态报告并写入缓存（在独立任务中运行）"""
+        report = await self._report_status_to_data_store(force=force)
+        # 已被状态变化后的新报告取代时，不用本报告覆盖缓存
+        if self._status_inflight is asyncio.current_task():
+            self._status_cache = report
+            self._status_cache_ts = time.monotonic()
+        return report
+    
+    def _clear_status_inflight(self, task: asyncio.Task):
+        """报告任务结束后清除登记（已被更新的报告替换时不清除）"""
+        if self._status_inflight is task:
+            self._status_inflight = None
+            self._status_inflight_fp = None
     
     async def shutdown(self):
         """关闭连接池"""
         logger.info(f"[{self.exchange}] 正在关闭连接池...")
         
-        if self.health_check_task:
-            self.health_check_task.cancel()
-        if self.monitor_scheduler_task:
-            self.monitor_scheduler_task.cancel()
+        # 取消并等待所有后台任务真正结束，避免遗留任务继续操作已关闭的连接
+        background_tasks = tuple(self._background_tasks)
+        for task in background_tasks:
+            task.cancel()
+        if background_tasks:
+            await asyncio.gather(*background_tasks, return_exceptions=True)
         
         tasks = []
-        for conn in self.master_connections:
+        for conn in self.master_connections.values():
             tasks.append(conn.disconnect())
-        for conn in self.warm_standby_connections:
+        for conn in self.warm_standby_connections.values():
             tasks.append(conn.disconnect())
         if self.monitor_connection:
             tasks.append(self.monitor_connection.disconnect())
@@ -489,4 +797,31 @@ class ExchangeWebSocketPool:
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
         
+        # 清空连接池与状态缓存，再次初始化时从头建立，避免旧连接残留在池中
+        self._reset_pool_state()
+        
         logger.info(f"[{self.exchange}] 连接池已关闭")
+    
+    def _reset_pool_state(self):
+        """重置连接池结构、计数与状态缓存（连接须已断开）"""
+        self.master_connections = {}
+        self.warm_standby_connections = {}
+        self.monitor_connection = None
+        self._master_order = []
+        self._masters_connected = 0
+        self._warms_connected = 0
+        
+        self.health_check_task = None
+        self.monitor_scheduler_task = None
+        
+        self._last_status_fingerprint = None
+        self._last_status_report = None
+        self._last_report_ts = 0.0
+        self._status_cache = None
+        self._status_cache_ts = 0.0
+        self._status_inflight = None
+        self._status_inflight_fp = None
+        self._status_out_queue = asyncio.Queue(maxsize=1)
+        
+        # 温备连接已断开，再次初始化时需要重新准备
+        self._prepared = False
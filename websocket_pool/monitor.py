@@ -8,13 +8,23 @@ from typing import Dict, Any
 
 logger = logging.getLogger(__name__)
 
+def _iso(ts) -> str:
+    """把连接池上报的 time.time() 时间戳格式化为ISO字符串（仅在展示时调用）"""
+    if isinstance(ts, (int, float)):
+        return datetime.fromtimestamp(ts).isoformat()
+    return ts
+
 class ConnectionMonitor:
     """连接健康监控器"""
     
+    __slots__ = ("pool_manager", "monitoring", "monitor_task", "_stop_event")
+    
     def __init__(self, pool_manager):
         self.pool_manager = pool_manager
         self.monitoring = False
         self.monitor_task = None
+        # 停止信号：监控循环的等待可被立即唤醒，无需等满30秒
+        self._stop_event = asyncio.Event()
         
     async def start_monitoring(self):
         """开始监控"""
@@ -22,6 +32,7 @@ class ConnectionMonitor:
             return
         
         self.monitoring = True
+        self._stop_event.clear()
         self.monitor_task = asyncio.create_task(self._monitor_loop())
         logger.info("连接监控已启动")
     
@@ -41,32 +52,52 @@ class ConnectionMonitor:
                                 disconnected = [m for m in masters if isinstance(m, dict) and not m.get("connected", False)]
                                 if disconnected:
                                     logger.warning(f"[{exchange}] {len(disconnected)}个主连接断开")
+                    
+                    # 不在等待期间持有上一轮的状态快照
+                    status = None
                 
-                await asyncio.sleep(30)
+                if await self._wait_stop(30):
+                    break
                 
-            except Exception as e:
-                logger.error(f"监控循环错误: {e}")
-                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("监控循环错误")
+                if await self._wait_stop(10):
+                    break
+    
+    async def _wait_stop(self, timeout: float) -> bool:
+        """等待停止信号，最多 timeout 秒；收到停止信号返回True"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
     
     async def stop_monitoring(self):
         """停止监控"""
         self.monitoring = False
+        self._stop_event.set()
         if self.monitor_task:
             self.monitor_task.cancel()
             try:
                 await self.monitor_task
             except asyncio.CancelledError:
                 pass
+            self.monitor_task = None
         
         logger.info("连接监控已停止")
     
     async def generate_report(self) -> Dict[str, Any]:
         """生成监控报告"""
+        # 整份报告共用同一个时间戳
+        now_iso = datetime.now().isoformat()
+        
         try:
             status = await self.pool_manager.get_all_status()
             
             report = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso,
                 "status": "healthy",
                 "exchanges": {},
                 "issues": []
@@ -77,30 +108,32 @@ class ConnectionMonitor:
                     masters = exchange_status.get("masters", [])
                     warm_standbys = exchange_status.get("warm_standbys", [])
                     
-                    connected_masters = [m for m in masters if isinstance(m, dict) and m.get("connected", False)]
-                    connected_warm = [w for w in warm_standbys if isinstance(w, dict) and w.get("connected", False)]
+                    total_m = len(masters)
+                    conn_m = sum(1 for m in masters if isinstance(m, dict) and m.get("connected"))
+                    total_w = len(warm_standbys)
+                    conn_w = sum(1 for w in warm_standbys if isinstance(w, dict) and w.get("connected"))
                     
                     report["exchanges"][exchange] = {
-                        "masters_total": len(masters),
-                        "masters_connected": len(connected_masters),
-                        "warm_standbys_total": len(warm_standbys),
-                        "warm_standbys_connected": len(connected_warm),
-                        "last_check": exchange_status.get("timestamp", datetime.now().isoformat())
+                        "masters_total": total_m,
+                        "masters_connected": conn_m,
+                        "warm_standbys_total": total_w,
+                        "warm_standbys_connected": conn_w,
+                        "last_check": _iso(exchange_status.get("timestamp", now_iso))
                     }
                     
-                    if len(connected_masters) < len(masters):
-                        report["issues"].append(f"{exchange}: {len(masters)-len(connected_masters)}个主连接断开")
+                    if conn_m < total_m:
+                        report["issues"].append(f"{exchange}: {total_m - conn_m}个主连接断开")
                         report["status"] = "warning"
                     
-                    if len(connected_warm) < len(warm_standbys):
-                        report["issues"].append(f"{exchange}: {len(warm_standbys)-len(connected_warm)}个温备连接断开")
+                    if conn_w < total_w:
+                        report["issues"].append(f"{exchange}: {total_w - conn_w}个温备连接断开")
             
             return report
             
         except Exception as e:
             logger.error(f"生成监控报告错误: {e}")
             return {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso,
                 "status": "error",
                 "error": str(e)
             }
\ No newline at end of file
@@ -2,13 +2,28 @@
 WebSocket连接池总管理器 - 角色互换版 + 增强诊断
 """
 import asyncio
+import functools
+import heapq
+import inspect
+import itertools
+import json
 import logging
+import re
 import sys
 import os
 import time
-from typing import Dict, Any, List, Optional
+from collections import Counter
+from types import MappingProxyType
+from typing import Dict, Any, Iterator, List, Optional, Callable, Tuple, Union
 import ccxt.async_support as ccxt_async
 
+# 可选：orjson 读写合约缓存更快，未安装时使用标准库json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # 设置导入路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.dirname(os.path.dirname(current_dir))  # brain_core目录
@@ -22,71 +37,278 @@ from .static_symbols import STATIC_SYMBOLS  # 导入静态合约
 
 logger = logging.getLogger(__name__)
 
+# get_all_status 快照有效期(秒)，监控循环与报告接口在期内共用同一份状态
+STATUS_SNAPSHOT_TTL = 5.0
+
+# API获取的合约列表的磁盘缓存（有效期由 EXCHANGE_CONFIGS 的 symbol_cache_ttl 配置，单位秒）
+SYMBOL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "xgb2")
+DEFAULT_SYMBOL_CACHE_TTL = 6 * 3600
+
+# 默认回调的批量写入：回调只入队，由所属管理器的消费者任务按批写入共享存储
+MARKET_QUEUE_SIZE = 10000   # 队列满时丢弃新行情并计数
+MARKET_BATCH_SIZE = 256     # 每次写入的最大条数
+
+# 合约名解析：币安 BTC/USDT、BTC/USDT:USDT；OKX BTC-USDT-SWAP、BTC/USDT:USDT（分组1为基础币种）
+# 基础币种不限于ASCII字母数字（如币安的“币安人生/USDT:USDT”），只排除分隔符
+_BINANCE_RE = re.compile(r'^([^/:]+)/USDT(?::USDT)?$')
+_OKX_RE = re.compile(r'^([^/:-]+)(?:-USDT-SWAP|/USDT:USDT)$')
+
+# 各交易所ccxt客户端的专用options（新增交易所只需加一项）
+_CCXT_OPTIONS = {
+    "okx": {
+        'defaultType': 'swap',
+        'fetchMarketDataRateLimit': 2000,  # 降低频率
+    },
+    "binance": {
+        'defaultType': 'future',
+        'warnOnFetchOHLCVLimitArgument': False,
+    },
+}
+
+# ccxt客户端基础配置（只用于获取合约列表）
+_CCXT_BASE_CONFIG = {
+    'apiKey': '',  # 不需要API密钥获取合约列表
+    'secret': '',
+    'enableRateLimit': True,
+    'timeout': 30000,  # 30秒超时
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _ccxt_config(exchange_name: str) -> MappingProxyType:
+    """按交易所构建一次的只读ccxt配置（未列出的交易所只用基础配置）"""
+    config = dict(_CCXT_BASE_CONFIG)
+    options = _CCXT_OPTIONS.get(exchange_name)
+    if options is not None:
+        config['options'] = MappingProxyType(dict(options))
+    return MappingProxyType(config)
+
+
+def _upper_field(value) -> str:
+    """市场字段转大写；非字符串字段（None、数字等）视为空串"""
+    return value.upper() if isinstance(value, str) else ''
+
+
+def _fmt_binance(symbol_upper: str, market: dict) -> Optional[str]:
+    """币安合约转换：BTC/USDT 或 BTC/USDT:USDT → BTCUSDT；非活跃USDT永续合约返回None"""
+    # 先用后缀判断排除非USDT交易对，避免对其执行正则与字典查找
+    if not symbol_upper.endswith(('/USDT', '/USDT:USDT')):
+        return None
+    m = _BINANCE_RE.match(symbol_upper)
+    if not m or not market.get('active'):
+        return None
+    if not (market.get('swap') or market.get('linear')):
+        return None
+    return m.group(1) + 'USDT'
+
+
+def _fmt_okx(symbol_upper: str, market: dict) -> Optional[str]:
+    """OKX合约转换：保持 BTC-USDT-SWAP 格式；非USDT永续合约返回None"""
+    # 多种方式判断是否为USDT永续合约（先做字符串判断，再查字典）
+    if not ('-USDT-' in symbol_upper or _upper_field(market.get('quote')) == 'USDT'):
+        return None
+    if not ('SWAP' in symbol_upper or _upper_field(market.get('type')) == 'SWAP' or market.get('swap', False)):
+        return None
+    contract_type = _upper_field(market.get('contractType'))
+    if not (contract_type == '' or 'PERPETUAL' in contract_type or 'SWAP' in contract_type):
+        return None
+    
+    m = _OKX_RE.match(symbol_upper)
+    if not m:
+        # 尝试从info中获取标准ID
+        info = market.get('info')
+        inst_id = info.get('instId') if isinstance(info, dict) else None
+        m = _OKX_RE.match(inst_id.upper()) if isinstance(inst_id, str) else None
+        if not m:
+            return None
+    return m.group(1) + '-USDT-SWAP'
+
+
+_SYMBOL_FORMATTERS = {
+    "binance": _fmt_binance,
+    "okx": _fmt_okx,
+}
+
+
+def _symbol_cache_path(exchange_name: str) -> str:
+    return os.path.join(SYMBOL_CACHE_DIR, f"symbols_{exchange_name}.json")
+
+
+def _read_symbol_cache(exchange_name: str, ttl: float, max_symbols: Optional[int] = None) -> Optional[List[str]]:
+    """读取未过期且合约上限一致的缓存；文件不存在、已过期、上限不同或损坏时返回None（阻塞IO，需在线程中调用）"""
+    path = _symbol_cache_path(exchange_name)
+    try:
+        if time.time() - os.path.getmtime(path) >= ttl:
+            return None
+        if ORJSON_AVAILABLE:
+            with open(path, "rb") as f:
+                payload = orjson.loads(f.read())
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        if payload.get("max_symbols") != max_symbols:
+            return None
+        symbols = payload.get("symbols")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return symbols if isinstance(symbols, list) and symbols else None
+
+
+def _write_symbol_cache(exchange_name: str, symbols: List[str], max_symbols: Optional[int] = None):
+    """原子写入合约缓存：先写临时文件再替换（阻塞IO，需在线程中调用）"""
+    path = _symbol_cache_path(exchange_name)
+    tmp_path = f"{path}.tmp"
+    os.makedirs(SYMBOL_CACHE_DIR, exist_ok=True)
+    payload = {"timestamp": time.time(), "max_symbols": max_symbols, "symbols": symbols}
+    if ORJSON_AVAILABLE:
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(payload))
+    else:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+async def _write_tick_batch(items: List[tuple]):
+    """把一批行情写入共享存储，失败时记录并丢弃"""
+    try:
+        await data_store.update_market_data_batch(items)
+    except Exception as e:
+        logger.error(f"批量写入市场数据失败: {e}，丢弃 {len(items)} 条")
+
+
+async def _tick_consumer_loop(queue: asyncio.Queue):
+    """从队列取出行情，积累当前已到达的数据后一次写入；收到 None 时写完剩余数据退出"""
+    stopping = False
+    while not stopping:
+        item = await queue.get()
+        if item is None:
+            break
+        batch = [item]
+        while len(batch) < MARKET_BATCH_SIZE:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+        
+        await _write_tick_batch(batch)
+
+
 # ============ 【修复：默认数据回调函数 - 支持原始数据】============
-async def default_data_callback(data):
+def _make_default_callback(owner: Optional["WebSocketPoolManager"] = None):
     """
-    默认数据回调函数 - 将WebSocket接收的原始数据直接存入共享存储
-    这是数据流的关键节点：WebSocket → 此函数 → data_store
-    现在data包含完整的raw_data字段
+    创建默认数据回调：消息计数器作为闭包变量，热路径上无需查找全局名
+    owner 为所属管理器，其行情队列在运行时入队；无 owner 或队列未运行时直接写入
     """
-    try:
-        # 验证数据有效性
-        if not data:
-            return
+    # 已处理的消息计数（每128条记录一次日志）与队列满时的丢弃计数
+    next_count = itertools.count(1).__next__
+    next_dropped = itertools.count(1).__next__
+    
+    async def default_data_callback(data):
+        """
+        默认数据回调函数 - 将WebSocket接收的原始数据直接存入共享存储
+        这是数据流的关键节点：WebSocket → 此函数 → data_store
+        现在data包含完整的raw_data字段
+        """
+        try:
+            # 验证数据有效性
+            if not data:
+                return
             
-        exchange = data.get("exchange", "")
-        symbol = data.get("symbol", "")
-        
-        if not exchange:
-            logger.error(f"数据缺少exchange字段: {data}")
-            return
-        if not symbol:
-            logger.error(f"数据缺少symbol字段: {data}")
-            return
-        
-        # ✅【关键修复】直接调用 data_store.update_market_data
-        # 传递三个参数：exchange, symbol, data
-        # 现在data包含完整的raw_data字段和原始数据
-        await data_store.update_market_data(exchange, symbol, data)
-        
-        # 记录日志（每100条记录一次，避免日志过多）
-        default_data_callback.counter = getattr(default_data_callback, 'counter', 0) + 1
-        if default_data_callback.counter % 100 == 0:
-            logger.info(f"[数据回调] 已处理 {default_data_callback.counter} 条原始数据，最新: {exchange} {symbol}")
+            # 连接层产出的数据固定带有 exchange/symbol 字段，直接取值（EAFP：正常路径无需 .get）
+            try:
+                exchange = data["exchange"]
+                symbol = data["symbol"]
+            except (KeyError, TypeError) as e:
+                # 非字典数据也在这里拦截，避免后续错误分支再对其调用 .get
+                logger.error(f"数据缺少exchange/symbol字段({e!r}): {data}")
+                return
             
-    except TypeError as e:
-        # 如果参数错误，记录详细错误信息
-        logger.error(f"回调参数错误: {e}，数据格式可能不正确")
-        logger.error(f"数据内容: exchange={data.get('exchange')}, symbol={data.get('symbol')}")
-        logger.error(f"数据keys: {list(data.keys())}")
-    except Exception as e:
-        logger.error(f"数据回调函数错误: {e}，数据: {data}")
+            if not exchange or not symbol:
+                logger.error(f"数据缺少exchange/symbol字段: {data}")
+                return
+            
+            # ✅ 入队后立即返回，由消费者任务批量写入 data_store
+            # 现在data包含完整的raw_data字段和原始数据
+            queue = owner._tick_queue if owner is not None else None
+            if queue is None:
+                # 消费者未运行（未通过管理器初始化或已关闭）：直接写入
+                await data_store.update_market_data(exchange, symbol, data)
+            else:
+                try:
+                    queue.put_nowait((exchange, symbol, data))
+                except asyncio.QueueFull:
+                    dropped = next_dropped()
+                    if dropped == 1 or not (dropped & 1023):
+                        logger.warning(f"[数据回调] 写入队列已满，累计丢弃 {dropped} 条行情")
+                    return
+            
+            # 记录日志（每128条记录一次，避免日志过多）
+            n = next_count()
+            if not (n & 127) and logger.isEnabledFor(logging.INFO):
+                logger.info("[数据回调] 已处理 %d 条原始数据，最新: %s %s", n, exchange, symbol)
+        
+        except TypeError as e:
+            # 如果参数错误，记录详细错误信息
+            logger.error(f"回调参数错误: {e}，数据格式可能不正确")
+            logger.error(f"数据内容: exchange={data.get('exchange')}, symbol={data.get('symbol')}")
+            logger.error(f"数据keys: {list(data.keys())}")
+        except Exception as e:
+            logger.error(f"数据回调函数错误: {e}，数据: {data}")
+    
+    return default_data_callback
+
+
+# 不属于任何管理器的默认回调：没有行情队列，直接写入共享存储
+default_data_callback = _make_default_callback()
 
 # ============ 【WebSocket连接池管理器类】============
 class WebSocketPoolManager:
     """WebSocket连接池管理器"""
     
-    def __init__(self, data_callback=None):  # ✅ 修改：参数改为可选
+    __slots__ = (
+        "data_callback", "on_exchange_ready", "exchange_pools", "initialized", "_initializing", "_shutting_down",
+        "_status_cache", "_status_cache_ts", "_status_lock",
+        "_uses_default_callback", "_tick_queue", "_tick_consumer",
+    )
+    
+    def __init__(self, data_callback=None, on_exchange_ready: Optional[Callable] = None):  # ✅ 修改：参数改为可选
         """
         初始化连接池管理器
         
         参数:
             data_callback: 数据回调函数，如果为None则使用默认回调
+            on_exchange_ready: 单个交易所连接池就绪时的回调 (exchange_name, pool)，可为同步或异步函数
         """
         # ✅【关键修改】优先使用传入的回调，如果没有则使用默认回调
         if data_callback:
             self.data_callback = data_callback
             logger.info(f"WebSocketPoolManager 使用自定义数据回调")
         else:
-            # 使用我们修复的默认回调（支持原始数据）
-            self.data_callback = default_data_callback
+            # 使用我们修复的默认回调（支持原始数据），行情经本管理器的队列批量写入
+            self.data_callback = _make_default_callback(self)
             logger.info(f"WebSocketPoolManager 使用默认数据回调（直接对接共享数据模块，支持原始数据）")
         
+        self.on_exchange_ready = on_exchange_ready
         self.exchange_pools = {}  # exchange_name -> ExchangeWebSocketPool
         self.initialized = False
         self._initializing = False  # ✅ 新增：初始化状态跟踪
         self._shutting_down = False  # ✅ 新增：关闭状态跟踪
         
+        # 默认回调的行情队列与消费者任务（每个管理器独立，initialize 时启动，shutdown 时停止）
+        self._uses_default_callback = not data_callback
+        self._tick_queue: Optional[asyncio.Queue] = None  # 待写入的 (exchange, symbol, data)，None 表示消费者未运行
+        self._tick_consumer: Optional[asyncio.Task] = None
+        
+        # 全部交易所状态快照（TTL内复用，加锁避免并发重复查询）
+        self._status_cache: Optional[Dict[str, Any]] = None
+        self._status_cache_ts = 0.0
+        self._status_lock = asyncio.Lock()
+        
     async def initialize(self):
         """初始化所有交易所连接池 - 防重入版"""
         if self.initialized or self._initializing:
@@ -98,28 +320,70 @@ class WebSocketPoolManager:
         logger.info("正在初始化WebSocket连接池管理器...")
         logger.info(f"{'=' * 60}")
         
-        # 获取所有交易所的合约（使用你的成功方法）
-        exchange_tasks = []
-        for exchange_name in ["binance", "okx"]:
-            if exchange_name in EXCHANGE_CONFIGS:
-                task = asyncio.create_task(self._setup_exchange_pool(exchange_name))
-                exchange_tasks.append(task)
+        # 使用默认回调时，先启动行情写入消费者
+        if self._uses_default_callback:
+            self._start_tick_consumer()
         
-        # 等待所有交易所初始化完成
-        if exchange_tasks:
-            await asyncio.gather(*exchange_tasks, return_exceptions=True)
+        # 获取所有交易所的合约（使用你的成功方法），TaskGroup 保证所有子任务结束后才返回
+        try:
+            async with asyncio.TaskGroup() as tg:
+                pending = {
+                    tg.create_task(self._setup_exchange_pool(exchange_name), name=f"init_{exchange_name}"): exchange_name
+                    for exchange_name in ("binance", "okx")
+                    if exchange_name in EXCHANGE_CONFIGS
+                }
+                
+                # 哪个交易所先完成就先报告，不必等最慢的交易所
+                while pending:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        await self._on_setup_done(pending.pop(task))
+        except* Exception as eg:
+            for e in eg.exceptions:
+                logger.error(f"交易所连接池初始化异常: {e!r}")
+        finally:
+            self._initializing = False
         
         self.initialized = True
-        self._initializing = False
         logger.info("✅ WebSocket连接池管理器初始化完成")
         logger.info(f"{'=' * 60}")
     
+    async def _on_setup_done(self, exchange_name: str):
+        """单个交易所初始化结束：记录结果，成功时通知 on_exchange_ready"""
+        pool = self.exchange_pools.get(exchange_name)
+        if pool is None:
+            logger.error(f"❌ [{exchange_name}] 连接池未就绪")
+            return
+        
+        logger.info(f"✅ [{exchange_name}] 连接池就绪: 主连接 {len(pool.master_connections)} 个，"
+                    f"温备连接 {len(pool.warm_standby_connections)} 个")
+        
+        if self.on_exchange_ready:
+            try:
+                result = self.on_exchange_ready(exchange_name, pool)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"[{exchange_name}] 就绪回调失败: {e}")
+    
     async def _setup_exchange_pool(self, exchange_name: str):
-        """设置单个交易所连接池"""
+        """设置单个交易所连接池（获取合约列表的同时建立与合约无关的连接）"""
+        # 0. 先创建连接池并在后台准备（TLS上下文、温备连接），与获取合约列表并行
+        pool = ExchangeWebSocketPool(exchange_name, self.data_callback)  # ✅ 这里使用正确的回调
+        prepare_task = asyncio.create_task(pool.prepare())
+        bound = False
+        
         try:
+            # 合约数量上限（基于活跃连接数计算），API获取时在筛选阶段即按此截取
+            # 这两项在 config.py 中为每个交易所必填，直接取值
+            cfg = EXCHANGE_CONFIGS[exchange_name]
+            active_connections = cfg["active_connections"]
+            symbols_per_conn = cfg["symbols_per_connection"]
+            max_symbols = symbols_per_conn * active_connections
+            
             # 1. 获取合约列表
             logger.info(f"[{exchange_name}] 获取合约列表中...")
-            symbols = await self._fetch_exchange_symbols(exchange_name)
+            symbols = await self._fetch_exchange_symbols(exchange_name, max_symbols)
             
             if not symbols:
                 logger.warning(f"[{exchange_name}] API获取失败，使用静态合约列表")
@@ -131,19 +395,16 @@ class WebSocketPoolManager:
             
             logger.info(f"[{exchange_name}] 成功获取 {len(symbols)} 个合约")
             
-            # 2. 限制合约数量（基于活跃连接数计算）
-            active_connections = EXCHANGE_CONFIGS[exchange_name].get("active_connections", 3)
-            symbols_per_conn = EXCHANGE_CONFIGS[exchange_name].get("symbols_per_connection", 300)
-            max_symbols = symbols_per_conn * active_connections
-            
+            # 2. 限制合约数量（静态列表可能超出上限）
             if len(symbols) > max_symbols:
                 logger.info(f"[{exchange_name}] 合约数量 {len(symbols)} > 限制 {max_symbols}，进行裁剪")
                 symbols = symbols[:max_symbols]
             
-            # 3. 初始化连接池
+            # 3. 等待准备完成后绑定合约，完成连接池初始化
             logger.info(f"[{exchange_name}] 初始化连接池...")
-            pool = ExchangeWebSocketPool(exchange_name, self.data_callback)  # ✅ 这里使用正确的回调
-            await pool.initialize(symbols)
+            await prepare_task
+            await pool.bind_symbols(symbols)
+            bound = True
             self.exchange_pools[exchange_name] = pool
             
             logger.info(f"✅ [{exchange_name}] 连接池初始化成功")
@@ -152,15 +413,38 @@ class WebSocketPoolManager:
             logger.error(f"[{exchange_name}] 设置失败: {e}")
             import traceback
             logger.error(traceback.format_exc())
+        
+        finally:
+            # 未能完成初始化时，关闭准备阶段已建立的连接
+            if not bound:
+                prepare_task.cancel()
+                await asyncio.gather(prepare_task, return_exceptions=True)
+                await pool.shutdown()
     
-    async def _fetch_exchange_symbols(self, exchange_name: str) -> List[str]:
-        """获取交易所的合约列表 - 增强稳健版"""
+    async def _fetch_exchange_symbols(self, exchange_name: str, max_symbols: Optional[int] = None) -> List[str]:
+        """获取交易所的合约列表 - 增强稳健版（max_symbols 为合约数量上限，None 表示不限制）"""
         symbols = []
         
+        # 第0步: 优先使用未过期的磁盘缓存（跳过秒级的API请求）
+        ttl = EXCHANGE_CONFIGS.get(exchange_name, {}).get("symbol_cache_ttl", DEFAULT_SYMBOL_CACHE_TTL)
+        symbols = await asyncio.to_thread(_read_symbol_cache, exchange_name, ttl, max_symbols)
+        if symbols:
+            logger.info(f"✅ [{exchange_name}] 使用磁盘缓存的合约列表，共 {len(symbols)} 个")
+            return symbols
+        
         # 第1步: 尝试从API动态获取 (主路径)
-        symbols = await self._fetch_symbols_via_api(exchange_name)
+        try:
+            symbols = await self._fetch_symbols_via_api(exchange_name, max_symbols)
+        except Exception as e:
+            # 解析或筛选出现意外错误时不放弃该交易所，降级到静态列表
+            logger.error(f"[{exchange_name}] 处理API市场数据失败: {e}")
+            symbols = []
         if symbols:
             logger.info(f"✅ [{exchange_name}] 通过API成功获取 {len(symbols)} 个合约")
+            try:
+                await asyncio.to_thread(_write_symbol_cache, exchange_name, symbols, max_symbols)
+            except OSError as e:
+                logger.warning(f"[{exchange_name}] 写入合约缓存失败: {e}")
             return symbols
         
         # 第2步: API失败，使用项目内置的静态列表 (降级)
@@ -169,183 +453,112 @@ class WebSocketPoolManager:
         logger.info(f"⚠️ [{exchange_name}] 使用静态合约列表，共 {len(symbols)} 个")
         return symbols
     
-    async def _fetch_symbols_via_api(self, exchange_name: str) -> List[str]:
+    async def _fetch_symbols_via_api(self, exchange_name: str, max_symbols: Optional[int] = None) -> List[str]:
         """方法1: 通过交易所API动态获取 - 修复版"""
-        exchange = None
         max_retries = 3
         
-        for attempt in range(1, max_retries + 1):
-            try:
-                # 针对不同交易所进行优化配置
-                config = self._get_exchange_config(exchange_name)
-                exchange_class = getattr(ccxt_async, exchange_name)
-                exchange = exchange_class(config)
-                
+        # 客户端只创建一次，重试时复用其HTTP连接与TLS会话
+        # 针对不同交易所进行优化配置
+        config = self._get_exchange_config(exchange_name)
+        exchange_class = getattr(ccxt_async, exchange_name)
+        exchange = exchange_class(config)
+        
+        try:
+            # 只对网络请求重试，解析与筛选在请求成功后执行一次
+            for attempt in range(1, max_retries + 1):
                 logger.info(f"[{exchange_name}] 正在加载市场数据... (尝试 {attempt}/{max_retries})")
-                
-                # 关键区别：不同交易所使用不同方法
-                if exchange_name == "okx":
-                    # OKX需要使用特定参数获取SWAP合约
-                    markets = await exchange.fetch_markets(params={'instType': 'SWAP'})
-                    # OKX的fetch_markets返回的是列表，需要转换为统一的字典格式
-                    markets_dict = {}
-                    for market in markets:
-                        symbol = market.get('symbol', '')
-                        if symbol:
-                            markets_dict[symbol.upper()] = market
-                    markets = markets_dict
-                else:
-                    # 币安等其他交易所使用load_markets，返回的是字典
-                    markets = await exchange.load_markets()
-                    # 将键转为大写
-                    markets = {k.upper(): v for k, v in markets.items()}
-                
-                logger.info(f"[{exchange_name}] 市场数据加载完成，共 {len(markets)} 个市场")
-                
-                # 处理并筛选合约
-                filtered_symbols = self._filter_and_format_symbols(exchange_name, markets)
-                
-                if filtered_symbols:
-                    # 打印分组统计
-                    symbol_groups = {}
-                    for s in filtered_symbols:
-                        prefix = s[:3]
-                        symbol_groups.setdefault(prefix, 0)
-                        symbol_groups[prefix] += 1
+                try:
+                    # 关键区别：不同交易所使用不同方法
+                    if exchange_name == "okx":
+                        # OKX需要使用特定参数获取SWAP合约
+                        markets = await exchange.fetch_markets(params={'instType': 'SWAP'})
+                    else:
+                        # 币安等其他交易所使用load_markets，返回的是字典
+                        markets = await exchange.load_markets(reload=True)
+                    break
                     
-                    top_groups = sorted(symbol_groups.items(), key=lambda x: x[1], reverse=True)[:5]
-                    group_info = ", ".join([f"{g[0]}:{g[1]}" for g in top_groups])
-                    logger.info(f"[{exchange_name}] 币种分组统计: {group_info}")
+                except Exception as e:
+                    # 安全地记录真正的错误原因
+                    error_detail = str(e) if e and hasattr(e, '__str__') else '未知错误'
                     
-                    # 检查是否有重复USDT问题
-                    duplicate_usdt_count = sum(1 for s in filtered_symbols if s.upper().endswith('USDTUSDT'))
-                    if duplicate_usdt_count > 0:
-                        logger.error(f"[{exchange_name}] ⚠️ 发现 {duplicate_usdt_count} 个重复USDT的合约!")
-                        # 显示有问题的合约
-                        problematic = [s for s in filtered_symbols if s.upper().endswith('USDTUSDT')][:5]
-                        logger.error(f"有问题的合约示例: {problematic}")
-                
-                await exchange.close()
-                return filtered_symbols
-                
-            except Exception as e:
-                # 安全地记录真正的错误原因
-                error_detail = str(e) if e and hasattr(e, '__str__') else '未知错误'
-                
-                if attempt < max_retries:
-                    wait_time = 2 ** attempt  # 指数退避
-                    logger.warning(f'[{exchange_name}] 第{attempt}次尝试失败，{wait_time}秒后重试: {error_detail}')
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f'[{exchange_name}] 所有{max_retries}次尝试均失败: {error_detail}')
-                    if exchange:
-                        await exchange.close()
-                    return []
+                    if attempt < max_retries:
+                        wait_time = 2 ** attempt  # 指数退避
+                        logger.warning(f'[{exchange_name}] 第{attempt}次尝试失败，{wait_time}秒后重试: {error_detail}')
+                        await asyncio.sleep(wait_time)
+                    else:
+                        logger.error(f'[{exchange_name}] 所有{max_retries}次尝试均失败: {error_detail}')
+                        return []
+        finally:
+            await exchange.close()
+        
+        # 不再重建市场字典：OKX直接使用fetch_markets返回的列表，
+        # 币安直接使用load_markets返回的字典，键的大写在筛选时统一处理
+        logger.info(f"[{exchange_name}] 市场数据加载完成，共 {len(markets)} 个市场")
+        
+        # 处理并筛选合约
+        filtered_symbols = self._filter_and_format_symbols(exchange_name, markets, max_symbols)
+        
+        if filtered_symbols:
+            # 打印分组统计
+            top_groups = Counter(s[:3] for s in filtered_symbols).most_common(5)
+            group_info = ", ".join([f"{g[0]}:{g[1]}" for g in top_groups])
+            logger.info(f"[{exchange_name}] 币种分组统计: {group_info}")
+            # 无需再扫描"USDTUSDT"：_BINANCE_RE 只捕获 '/' 之前的基础币种，不会重复拼接USDT
+        
+        return filtered_symbols
     
     def _get_exchange_config(self, exchange_name: str) -> dict:
-        """获取针对不同交易所优化的配置"""
-        base_config = {
-            'apiKey': '',  # 不需要API密钥获取合约列表
-            'secret': '',
-            'enableRateLimit': True,
-            'timeout': 30000,  # 30秒超时
-        }
-        
-        if exchange_name == "okx":
-            # OKX专用配置
-            base_config.update({
-                'options': {
-                    'defaultType': 'swap',
-                    'fetchMarketDataRateLimit': 2000,  # 降低频率
-                }
-            })
-        elif exchange_name == "binance":
-            # 币安专用配置
-            base_config.update({
-                'options': {
-                    'defaultType': 'future',
-                    'warnOnFetchOHLCVLimitArgument': False,
-                }
-            })
+        """获取针对不同交易所优化的配置（返回副本：ccxt 会修改传入的配置）"""
+        config = dict(_ccxt_config(exchange_name))
+        if 'options' in config:
+            config['options'] = dict(config['options'])
+        return config
+    
+    @staticmethod
+    def _iter_markets(exchange_name: str, markets: Union[dict, list]) -> Iterator[Tuple[str, dict]]:
+        """统一遍历 (symbol, market)：兼容 load_markets 的字典与 fetch_markets 的列表，格式异常的条目记录后跳过"""
+        if isinstance(markets, dict):
+            items = markets.items()
+        else:
+            items = ((m.get('symbol') if isinstance(m, dict) else None, m) for m in markets)
         
-        return base_config
+        for symbol, market in items:
+            if isinstance(symbol, str) and symbol and isinstance(market, dict):
+                yield symbol, market
+            else:
+                # 惰性格式化：DEBUG 未开启时不拼接字符串
+                logger.debug("[%s] 跳过格式异常的市场: %r", exchange_name, symbol)
     
-    def _filter_and_format_symbols(self, exchange_name: str, markets: dict) -> List[str]:
-        """统一的合约筛选与格式化逻辑"""
-        all_usdt_symbols = []
+    def _filter_and_format_symbols(self, exchange_name: str, markets: Union[dict, list],
+                                   max_symbols: Optional[int] = None) -> List[str]:
+        """统一的合约筛选与格式化逻辑（超过 max_symbols 时只保留排序后的前 max_symbols 个）"""
         logger.info(f"[{exchange_name}] 分析市场中...")
         
-        for symbol, market in markets.items():
-            try:
-                symbol_upper = symbol.upper()
-                
-                if exchange_name == "binance":
-                    # 币安合约转换 - 解决重复USDT
-                    is_perpetual = market.get('swap', False) or market.get('linear', False)
-                    is_active = market.get('active', False)
-                    is_usdt = '/USDT' in symbol_upper
-                    
-                    if is_perpetual and is_active and is_usdt:
-                        # 暴力提取基础币种名
-                        # 格式可能是: BTC/USDT 或 BTC/USDT:USDT
-                        parts = symbol_upper.split('/')
-                        if len(parts) >= 2:
-                            base_symbol = parts[0]  # BTC部分
-                            
-                            # 清理base_symbol中可能存在的:USDT
-                            if ':USDT' in base_symbol:
-                                base_symbol = base_symbol.split(':')[0]
-                            
-                            # 组成最终合约名
-                            clean_symbol = f"{base_symbol}USDT"
-                            
-                            # 最终检查：确保没有重复USDT
-                            if clean_symbol.endswith('USDTUSDT'):
-                                clean_symbol = clean_symbol[:-4]  # 去掉一个USDT
-                            
-                            all_usdt_symbols.append(clean_symbol)
-                            
-                            # 调试：记录前几个合约的转换
-                            if len(all_usdt_symbols) <= 3:
-                                logger.info(f"币安合约转换示例: {symbol} → {clean_symbol}")
-                        
-                elif exchange_name == "okx":
-                    # OKX合约转换 - 更稳健的判断
-                    market_type = market.get('type', '').upper()
-                    quote = market.get('quote', '').upper()
-                    contract_type = market.get('contractType', '').upper()
-                    
-                    # 多种方式判断是否为USDT永续合约
-                    is_swap = market_type == 'SWAP' or market.get('swap', False) or 'SWAP' in symbol_upper
-                    is_usdt_quote = quote == 'USDT' or '-USDT-' in symbol_upper
-                    is_perpetual_contract = 'PERPETUAL' in contract_type or contract_type == '' or 'SWAP' in contract_type
-                    
-                    if is_swap and is_usdt_quote and is_perpetual_contract:
-                        # OKX保持 BTC-USDT-SWAP 格式
-                        if '-USDT-SWAP' in symbol_upper:
-                            clean_symbol = symbol.upper()  # 保持 BTC-USDT-SWAP 格式
-                        elif '/USDT:USDT' in symbol_upper:
-                            clean_symbol = symbol.replace('/USDT:USDT', '-USDT-SWAP').upper()
-                        else:
-                            # 尝试从info中获取标准ID
-                            inst_id = market.get('info', {}).get('instId', '')
-                            if inst_id and '-USDT-SWAP' in inst_id.upper():
-                                clean_symbol = inst_id.upper()
-                            else:
-                                continue
-                        
-                        all_usdt_symbols.append(clean_symbol)
-                        
-                        # 调试：记录前几个合约的转换
-                        if len(all_usdt_symbols) <= 3:
-                            logger.info(f"OKX合约转换示例: {symbol} → {clean_symbol}")
-                
-            except Exception as e:
-                logger.debug(f"[{exchange_name}] 处理市场 {symbol} 时跳过: {e}")
-                continue
+        # 条目格式的校验集中在 _iter_markets，格式化函数对字段类型容错，循环内无需捕获异常
+        fmt = _SYMBOL_FORMATTERS.get(exchange_name)
+        valid_markets = self._iter_markets(exchange_name, markets) if fmt is not None else iter(())
+        converted = (
+            (symbol, clean_symbol)
+            for symbol, market in valid_markets
+            for clean_symbol in (fmt(symbol.upper(), market),)
+            if clean_symbol
+        )
         
-        # 去重排序
-        symbols = sorted(list(set(all_usdt_symbols)))
+        # 调试：记录前几个合约的转换
+        label = "币安" if exchange_name == "binance" else "OKX"
+        seen = set()
+        for symbol, clean_symbol in itertools.islice(converted, 3):
+            logger.info("%s合约转换示例: %s → %s", label, symbol, clean_symbol)
+            seen.add(clean_symbol)
+        
+        # 其余结果直接写入集合去重，不再生成中间列表
+        seen.update(clean_symbol for _, clean_symbol in converted)
+        if max_symbols is not None and len(seen) > max_symbols:
+            # 只需前 max_symbols 个：部分排序，结果与 sorted(seen)[:max_symbols] 相同
+            logger.info(f"[{exchange_name}] 合约数量 {len(seen)} > 限制 {max_symbols}，进行裁剪")
+            symbols = heapq.nsmallest(max_symbols, seen)
+        else:
+            symbols = sorted(seen)
         
         if symbols:
             logger.info(f"✅ [{exchange_name}] 发现 {len(symbols)} 个USDT永续合约")
@@ -357,7 +570,7 @@ class WebSocketPoolManager:
             # 打印一些市场信息帮助调试
             logger.info(f"[{exchange_name}] 市场样例 (前5个):")
             count = 0
-            for symbol, market in list(markets.items())[:5]:
+            for symbol, market in itertools.islice(self._iter_markets(exchange_name, markets), 5):
                 market_type = market.get('type', 'unknown')
                 quote = market.get('quote', 'unknown')
                 active = market.get('active', False)
@@ -367,23 +580,68 @@ class WebSocketPoolManager:
         return symbols
     
     def _get_static_symbols(self, exchange_name: str) -> List[str]:
-        """备用方案：获取静态合约列表"""
-        return STATIC_SYMBOLS.get(exchange_name, [])
+        """备用方案：获取静态合约列表（去重并保持原有顺序）"""
+        return list(dict.fromkeys(STATIC_SYMBOLS.get(exchange_name, ())))
     
     async def get_all_status(self) -> Dict[str, Any]:
-        """获取所有交易所连接状态"""
+        """获取所有交易所连接状态（快照有效期内直接复用）"""
+        async with self._status_lock:
+            if (self._status_cache is not None
+                    and time.monotonic() - self._status_cache_ts < STATUS_SNAPSHOT_TTL):
+                return self._status_cache
+            
+            self._status_cache = await self._collect_all_status()
+            self._status_cache_ts = time.monotonic()
+            return self._status_cache
+    
+    async def _collect_all_status(self) -> Dict[str, Any]:
+        """查询所有交易所连接状态（各交易所并发查询）"""
         status = {}
         
-        for exchange_name, pool in self.exchange_pools.items():
-            try:
-                pool_status = await pool.get_status()
-                status[exchange_name] = pool_status
-            except Exception as e:
-                logger.error(f"[{exchange_name}] 获取状态错误: {e}")
-                status[exchange_name] = {"error": str(e)}
+        names = list(self.exchange_pools.keys())
+        results = await asyncio.gather(
+            *(pool.get_status() for pool in self.exchange_pools.values()),
+            return_exceptions=True
+        )
+        
+        for exchange_name, result in zip(names, results):
+            if isinstance(result, asyncio.CancelledError):
+                # 单个交易所的查询被取消（如该连接池正在关闭）只记为该交易所失败；本任务自身被取消时 gather 已直接抛出
+                logger.warning(f"[{exchange_name}] 获取状态被取消")
+                status[exchange_name] = {"error": "cancelled"}
+            elif isinstance(result, BaseException):
+                logger.error(f"[{exchange_name}] 获取状态错误: {result}")
+                status[exchange_name] = {"error": str(result)}
+            else:
+                status[exchange_name] = result
         
         return status
     
+    def _start_tick_consumer(self):
+        """创建行情队列并启动消费者任务（已在运行时跳过）"""
+        if self._tick_consumer is not None and not self._tick_consumer.done():
+            return
+        self._tick_queue = asyncio.Queue(maxsize=MARKET_QUEUE_SIZE)
+        self._tick_consumer = asyncio.create_task(_tick_consumer_loop(self._tick_queue))
+    
+    async def _stop_tick_consumer(self):
+        """停止消费者：之后的行情直接写入，队列中剩余的行情写完后再返回"""
+        queue, consumer = self._tick_queue, self._tick_consumer
+        self._tick_queue = self._tick_consumer = None
+        if queue is None:
+            return
+        
+        if consumer is not None and not consumer.done():
+            # 消费者持续取数，队列满时这里也只需短暂等待
+            await queue.put(None)
+            await consumer
+            return
+        
+        # 消费者已异常退出：直接写入剩余行情
+        items = [item for item in (queue.get_nowait() for _ in range(queue.qsize())) if item is not None]
+        if items:
+            await _write_tick_batch(items)
+    
     async def shutdown(self):
         """关闭所有连接池 - 防重入版"""
         # ✅ 防重入检查
@@ -394,10 +652,22 @@ class WebSocketPoolManager:
         self._shutting_down = True
         logger.info("正在关闭所有WebSocket连接池...")
         
-        for exchange_name, pool in self.exchange_pools.items():
-            try:
-                await pool.shutdown()
-            except Exception as e:
-                logger.error(f"[{exchange_name}] 关闭连接池错误: {e}")
+        # 各交易所并发关闭，总耗时取决于最慢的一个
+        names = list(self.exchange_pools.keys())
+        results = await asyncio.gather(
+            *(pool.shutdown() for pool in self.exchange_pools.values()),
+            return_exceptions=True
+        )
+        
+        for exchange_name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.error(f"[{exchange_name}] 关闭连接池错误: {result}")
+        
+        # 写入默认回调队列中尚未写入的行情
+        await self._stop_tick_consumer()
+        
+        # 释放已关闭的连接池及其状态快照
+        self.exchange_pools.clear()
+        self._status_cache = None
         
         logger.info("✅ 所有WebSocket连接池已关闭")